@@ -8,25 +8,62 @@ weather data collected by the weather_logger.py script.
 """
 
 import os
-import csv
+import time
 import datetime
-import json
-from flask import Flask, render_template, jsonify
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-from matplotlib.dates import DateFormatter
+import threading
+import functools
+import queue
+from flask import Flask, Response, render_template, request, abort
+import numpy as np
+import orjson
 import io
-import base64
+
+# matplotlib is slow to import and only needed to render chart images, so
+# it is imported on first use instead of here
+
+# pyarrow is optional; it parses the log faster than numpy when available
+try:
+    import pyarrow
+    import pyarrow.csv
+    pyarrow_available = True
+except ImportError:
+    pyarrow_available = False
 
 # Import sensor reading functions
 from weather_logger import read_dht22, read_bmp280, LOG_FILE
+from config import (
+    LOG_COLUMNS, LOG_INTERVAL, READINGS_CACHE_TIME, MAX_HISTORY_HOURS,
+    WEB_HOST, WEB_PORT, WEB_THREADS, DEBUG_MODE
+)
 
 app = Flask(__name__)
 
-# Function to get current sensor readings
+# Function to create a JSON response, encoding numpy arrays without
+# converting them to Python lists first
+def json_response(data):
+    return app.response_class(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY),
+                              mimetype='application/json')
+
+# Cache of the current readings, shared by all requests
+_readings_cache = {'time': None, 'readings': None}
+_readings_lock = threading.Lock()
+
+# Function to get current sensor readings. Readings are reused for
+# READINGS_CACHE_TIME seconds, so frequent or concurrent requests cause one
+# sensor read instead of one each.
 def get_current_readings():
+    with _readings_lock:
+        current_time = time.monotonic()
+        if _readings_cache['time'] is not None and \
+                current_time - _readings_cache['time'] < READINGS_CACHE_TIME:
+            return _readings_cache['readings']
+        
+        _readings_cache['readings'] = _read_current_readings()
+        _readings_cache['time'] = current_time
+        return _readings_cache['readings']
+
+# Function to read and format the sensors
+def _read_current_readings():
     # Read sensor data
     temp_dht, humidity = read_dht22()
     temp_bmp, pressure, altitude = read_bmp280()
@@ -43,106 +80,257 @@ def get_current_readings():
     
     return readings
 
-# Function to read historical data from CSV
-def get_historical_data(hours=24):
-    if not os.path.exists(LOG_FILE):
-        return []
+# Cache of the historical log. The log file is append-only, so after the first
+# read only the bytes appended since the last call need to be parsed. Each
+# column is kept in its own numpy array; rows [_cache_start, _cache_end) are
+# live and the arrays grow by doubling.
+CACHE_DTYPES = {column: np.float32 for column in LOG_COLUMNS[1:]}
+CACHE_DTYPES['timestamp'] = 'datetime64[s]'  # Log timestamps have whole-second resolution
+_cache_arrays = None
+_cache_start = 0
+_cache_end = 0
+_cache_offset = 0  # Byte offset in LOG_FILE up to which rows have been parsed
+_cache_hours = 0  # Longest window requested so far; older rows are dropped
+_cache_lock = threading.Lock()
+
+# Function to parse the rows appended to the log since the given byte offset
+def _read_log_tail(offset):
+    with open(LOG_FILE, 'rb') as file:
+        file.seek(offset)
+        data = file.read()
     
-    try:
-        # Read data from CSV file
-        df = pd.read_csv(LOG_FILE)
-        
-        # Convert timestamp to datetime
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        
-        # Filter data for the specified time period
-        cutoff_time = datetime.datetime.now() - datetime.timedelta(hours=hours)
-        df = df[df['timestamp'] > cutoff_time]
-        
-        # Sort by timestamp
-        df = df.sort_values('timestamp')
-        
-        return df
-    except Exception as e:
-        print(f"Error reading historical data: {e}")
-        return []
+    # Only consume complete lines; a row still being written is picked up next time
+    end = data.rfind(b'\n') + 1
+    if end == 0:
+        return None, offset
+    data = data[:end]
+    
+    # Skip the header line on the first read
+    if offset == 0:
+        data = data[data.index(b'\n') + 1:]
+    
+    if not data.strip():
+        return None, offset + end
+    
+    return _parse_log_rows(data), offset + end
 
-# Function to generate temperature chart
-def generate_temperature_chart(hours=24):
-    df = get_historical_data(hours)
+# Function to parse log rows with known column types into one array per column.
+# Rows with the wrong number of fields (cut short by a crash) are skipped.
+# Returns None if no row could be parsed.
+def _parse_log_rows(data):
+    if pyarrow_available:
+        column_types = {column: pyarrow.float32() for column in LOG_COLUMNS[1:]}
+        column_types['timestamp'] = pyarrow.timestamp('s')
+        table = pyarrow.csv.read_csv(
+            io.BytesIO(data),
+            read_options=pyarrow.csv.ReadOptions(column_names=LOG_COLUMNS, block_size=1 << 20),
+            parse_options=pyarrow.csv.ParseOptions(invalid_row_handler=lambda row: 'skip'),
+            convert_options=pyarrow.csv.ConvertOptions(column_types=column_types))
+        if table.num_rows == 0:
+            return None
+        return {column: table.column(column).to_numpy() for column in LOG_COLUMNS}
     
-    if len(df) == 0:
+    # Every row starts with a fixed-width timestamp, which numpy converts
+    # directly; skip rows whose timestamp or fields were cut short
+    separators = len(LOG_COLUMNS) - 1
+    lines = [line for line in data.splitlines()
+             if line.find(b',') == 19 and line.count(b',') == separators]
+    if not lines:
         return None
+    rows = {'timestamp': np.array(lines, dtype='S19').astype('datetime64[s]')}
     
-    plt.figure(figsize=(10, 6))
-    plt.plot(df['timestamp'], df['temperature_dht'], 'r-', label='DHT22')
-    plt.plot(df['timestamp'], df['temperature_bmp'], 'b-', label='BMP280')
-    plt.title('Temperature History')
-    plt.xlabel('Time')
-    plt.ylabel('Temperature (°C)')
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    
-    # Convert plot to base64 string
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    image_png = buffer.getvalue()
-    buffer.close()
-    plt.close()
+    # Empty fields (failed sensor reads) need a converter, which is slower,
+    # so only use it when the plain float parser rejects a row
+    options = dict(delimiter=',', usecols=range(1, len(LOG_COLUMNS)), dtype=np.float32, ndmin=2)
+    try:
+        readings = np.loadtxt(lines, **options)
+    except ValueError:
+        readings = np.loadtxt(lines, converters=lambda field: float(field or 'nan'), **options)
     
-    return base64.b64encode(image_png).decode('utf-8')
+    for index, column in enumerate(LOG_COLUMNS[1:]):
+        rows[column] = readings[:, index]
+    return rows
 
-# Function to generate humidity chart
-def generate_humidity_chart(hours=24):
-    df = get_historical_data(hours)
+# Function to append parsed rows to the cached column arrays
+def _append_to_cache(rows):
+    global _cache_arrays, _cache_start, _cache_end
     
-    if len(df) == 0:
-        return None
+    count = len(rows['timestamp'])
+    capacity = len(_cache_arrays['timestamp']) if _cache_arrays is not None else 0
+    live = _cache_end - _cache_start
     
-    plt.figure(figsize=(10, 6))
-    plt.plot(df['timestamp'], df['humidity'], 'g-')
-    plt.title('Humidity History')
-    plt.xlabel('Time')
-    plt.ylabel('Humidity (%)')
-    plt.grid(True)
-    plt.tight_layout()
+    # Reallocate when full. Arrays already handed out are never written to,
+    # so a reader holding an older window is unaffected.
+    if _cache_end + count > capacity:
+        capacity = max(64, 2 * (live + count))
+        arrays = {column: np.empty(capacity, dtype=dtype) for column, dtype in CACHE_DTYPES.items()}
+        if _cache_arrays is not None:
+            for column in LOG_COLUMNS:
+                arrays[column][:live] = _cache_arrays[column][_cache_start:_cache_end]
+        _cache_arrays, _cache_start, _cache_end = arrays, 0, live
     
-    # Convert plot to base64 string
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-    image_png = buffer.getvalue()
-    buffer.close()
-    plt.close()
+    for column in LOG_COLUMNS:
+        _cache_arrays[column][_cache_end:_cache_end + count] = rows[column]
+    _cache_end += count
     
-    return base64.b64encode(image_png).decode('utf-8')
+    # Rows are logged in order; only sort if the clock jumped back
+    timestamps = _cache_arrays['timestamp'][_cache_start:_cache_end]
+    tail = timestamps[max(live - 1, 0):]
+    if (tail[1:] < tail[:-1]).any():
+        order = np.argsort(timestamps, kind='stable')
+        _cache_arrays = {column: _cache_arrays[column][_cache_start:_cache_end][order]
+                         for column in LOG_COLUMNS}
+        _cache_start, _cache_end = 0, len(order)
 
-# Function to generate pressure chart
-def generate_pressure_chart(hours=24):
-    df = get_historical_data(hours)
+# Function to get the cached log columns for the specified time period
+def get_historical_window(hours=24):
+    global _cache_arrays, _cache_start, _cache_end, _cache_offset, _cache_hours
     
-    if len(df) == 0:
-        return None
+    empty = {column: np.empty(0, dtype=dtype) for column, dtype in CACHE_DTYPES.items()}
+    
+    # The longest window sets how much of the log the cache keeps
+    hours = min(max(hours, 0), MAX_HISTORY_HOURS)
+    
+    try:
+        size = os.path.getsize(LOG_FILE)
+    except OSError:
+        return empty
     
-    plt.figure(figsize=(10, 6))
-    plt.plot(df['timestamp'], df['pressure'], 'b-')
-    plt.title('Barometric Pressure History')
-    plt.xlabel('Time')
-    plt.ylabel('Pressure (hPa)')
-    plt.grid(True)
-    plt.tight_layout()
+    try:
+        with _cache_lock:
+            # Start over if the log was truncated or replaced, or if a longer
+            # window than the cache retains is requested
+            if size < _cache_offset or hours > _cache_hours:
+                _cache_arrays = None
+                _cache_start = _cache_end = 0
+                _cache_offset = 0
+                _cache_hours = max(hours, _cache_hours)
+            
+            # Merge newly appended rows into the cache
+            if size != _cache_offset:
+                new_rows, _cache_offset = _read_log_tail(_cache_offset)
+                if new_rows is not None:
+                    _append_to_cache(new_rows)
+            
+            if _cache_arrays is None:
+                return empty
+            
+            now = np.datetime64(datetime.datetime.now(), 's')
+            
+            # Drop rows that have fallen out of the longest window to bound memory
+            timestamps = _cache_arrays['timestamp'][_cache_start:_cache_end]
+            _cache_start += int(np.searchsorted(
+                timestamps, now - np.timedelta64(_cache_hours, 'h'), side='right'))
+            
+            # Filter data for the specified time period
+            timestamps = _cache_arrays['timestamp'][_cache_start:_cache_end]
+            start = _cache_start + int(np.searchsorted(
+                timestamps, now - np.timedelta64(hours, 'h'), side='right'))
+            return {column: _cache_arrays[column][start:_cache_end] for column in LOG_COLUMNS}
+    except Exception as e:
+        print(f"Error reading historical data: {e}")
+        return empty
+
+# Function to format timestamps as strings, as they appear in the log
+def _format_timestamps(timestamps):
+    if len(timestamps) == 0:
+        return []
+    
+    return np.char.replace(np.datetime_as_string(timestamps, unit='s'), 'T', ' ').tolist()
+
+# Function to get a key that changes whenever chart data may have changed:
+# new rows change the log size, and the time bucket moves the window along
+def _chart_stamp():
+    try:
+        size = os.path.getsize(LOG_FILE)
+    except OSError:
+        size = 0
+    return size, int(time.time() // LOG_INTERVAL)
+
+# Decorator to reuse a rendered chart until its data changes. Renders are
+# serialized, so concurrent page views wait for one render and then share it
+# instead of each drawing a new figure.
+def cached_chart(func):
+    @functools.lru_cache(maxsize=16)
+    def render(hours, stamp):
+        return func(hours)
+    
+    lock = threading.Lock()
     
-    # Convert plot to base64 string
+    @functools.wraps(func)
+    def wrapper(hours=24):
+        stamp = _chart_stamp()
+        with lock:
+            return render(hours, stamp)
+    
+    return wrapper
+
+# Function to create a figure for a chart image
+def _new_figure():
+    from matplotlib.figure import Figure
+    return Figure(figsize=(10, 6))
+
+# Function to convert a figure to PNG bytes
+def _figure_to_png(fig):
     buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
+    fig.savefig(buffer, format='png', dpi=72)
     image_png = buffer.getvalue()
     buffer.close()
-    plt.close()
     
-    return base64.b64encode(image_png).decode('utf-8')
+    return image_png
+
+# Series (column, line style, legend label), title and y axis label of each chart
+CHART_SPECS = {
+    'temp': ([('temperature_dht', 'r-', 'DHT22'), ('temperature_bmp', 'b-', 'BMP280')],
+             'Temperature History', 'Temperature (°C)'),
+    'humidity': ([('humidity', 'g-', None)], 'Humidity History', 'Humidity (%)'),
+    'pressure': ([('pressure', 'b-', None)], 'Barometric Pressure History', 'Pressure (hPa)')
+}
+
+# Figures are cleared and reused between renders, since creating a figure
+# costs more than drawing on it
+_figure_pool = queue.LifoQueue()
+
+# Function to draw a chart from a window of historical data
+def _render_chart(window, kind):
+    series, title, ylabel = CHART_SPECS[kind]
+    
+    try:
+        fig = _figure_pool.get_nowait()
+        fig.clf()
+    except queue.Empty:
+        fig = _new_figure()
+    
+    try:
+        ax = fig.add_subplot()
+        for column, style, label in series:
+            ax.plot(window['timestamp'], window[column], style, label=label)
+        ax.set_title(title)
+        ax.set_xlabel('Time')
+        ax.set_ylabel(ylabel)
+        if len(series) > 1:
+            ax.legend()
+        ax.grid(True)
+        fig.tight_layout()
+        
+        # Convert plot to PNG
+        return _figure_to_png(fig)
+    finally:
+        _figure_pool.put(fig)
+
+# Function to generate all history charts from a single read of the data
+@cached_chart
+def generate_all_charts(hours=24):
+    window = get_historical_window(hours)
+    
+    if len(window['timestamp']) == 0:
+        return dict.fromkeys(CHART_SPECS)
+    
+    return {kind: _render_chart(window, kind) for kind in CHART_SPECS}
+
+# Function to check a history window length requested by a client
+def valid_hours(hours):
+    return 1 <= hours <= MAX_HISTORY_HOURS
 
 # Routes
 @app.route('/')
@@ -152,34 +340,68 @@ def index():
 
 @app.route('/history')
 def history():
-    # Generate charts
-    temp_chart = generate_temperature_chart()
-    humidity_chart = generate_humidity_chart()
-    pressure_chart = generate_pressure_chart()
+    # Charts are drawn in the browser from /api/history; /chart/<kind>.png
+    # serves rendered images for browsers without JavaScript or Chart.js
+    has_data = len(get_historical_window()['timestamp']) > 0
     
-    return render_template('history.html', 
-                           temp_chart=temp_chart,
-                           humidity_chart=humidity_chart,
-                           pressure_chart=pressure_chart)
+    return render_template('history.html', has_data=has_data)
+
+@app.route('/chart/<kind>.png')
+def chart(kind):
+    if kind not in CHART_SPECS:
+        abort(404)
+    
+    hours = request.args.get('hours', 24, type=int)
+    if not valid_hours(hours):
+        abort(400)
+    
+    # The ETag changes whenever the chart would be rendered differently, so
+    # browsers revalidating an unchanged chart get a 304 without a render
+    size, bucket = _chart_stamp()
+    etag = f"{kind}-{hours}-{size}-{bucket}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        charts = generate_all_charts(hours)
+        if charts.get(kind) is None:
+            abort(404)
+        response = Response(charts[kind], mimetype='image/png')
+    
+    response.set_etag(etag)
+    response.cache_control.max_age = 60
+    return response
 
 @app.route('/api/current')
 def api_current():
-    return jsonify(get_current_readings())
+    return json_response(get_current_readings())
 
 @app.route('/api/history/<int:hours>')
 def api_history(hours=24):
-    df = get_historical_data(hours)
-    if len(df) == 0:
-        return jsonify([])
+    if not valid_hours(hours):
+        abort(400)
+    
+    window = get_historical_window(hours)
     
-    # Convert DataFrame to list of dictionaries
-    records = df.to_dict('records')
+    # Send one list per column rather than one object per row
+    data = {'timestamp': _format_timestamps(window['timestamp'])}
+    data.update((column, window[column]) for column in LOG_COLUMNS[1:])
     
-    # Convert timestamps to strings
-    for record in records:
-        record['timestamp'] = record['timestamp'].strftime("%Y-%m-%d %H:%M:%S")
+    return json_response(data)
+
+# Function to run the web interface. Requests are served by waitress with a
+# pool of threads; Flask's development server is used in debug mode or if
+# waitress is not installed.
+def run_server(host=WEB_HOST, port=WEB_PORT, debug=DEBUG_MODE):
+    if not debug:
+        try:
+            from waitress import serve
+        except ImportError:
+            print("waitress not installed. Using Flask's development server.")
+        else:
+            serve(app, host=host, port=port, threads=WEB_THREADS)
+            return
     
-    return jsonify(records)
+    app.run(host=host, port=port, debug=debug, threaded=True)
 
 if __name__ == '__main__':
     # Create templates directory if it doesn't exist
@@ -190,4 +412,4 @@ if __name__ == '__main__':
     os.makedirs('static/js', exist_ok=True)
     
     # Run the Flask app
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    run_server()
\ No newline at end of file
@@ -18,11 +18,24 @@ SEA_LEVEL_PRESSURE = 1013.25  # Standard sea level pressure in hPa
 DATA_DIR = "data"  # Directory to store data files
 LOG_FILE = os.path.join(DATA_DIR, "weather_log.csv")  # CSV file for weather data
 LOG_INTERVAL = 300  # Logging interval in seconds (default: 5 minutes)
+LOG_COLUMNS = ['timestamp', 'temperature_dht', 'humidity', 'temperature_bmp', 'pressure', 'altitude']  # CSV columns
+LOG_DECIMALS = 3  # Readings are logged rounded to this many decimal places (trailing zeros dropped)
+# Logged rows are held in memory until written, so with LOG_FLUSH_ROWS above 1
+# a crash or power loss loses up to LOG_FLUSH_SECONDS of rows, and the web
+# interface and alerts see new rows up to LOG_FLUSH_SECONDS late. Set
+# LOG_FLUSH_ROWS = 1 to write every row as soon as it is logged.
+LOG_FLUSH_SECONDS = 60  # Longest time a logged row waits before it is written to the log file
+LOG_FLUSH_ROWS = max(1, LOG_FLUSH_SECONDS // LOG_INTERVAL)  # Rows written to the log file at a time (1, i.e. every row, at the default interval)
+PARQUET_ARCHIVE = False  # Also archive readings to daily Parquet files in DATA_DIR (requires pyarrow)
+PARQUET_BATCH_ROWS = 64  # Rows buffered before a batch is written to the Parquet archive
 
 # Web Interface Configuration
 WEB_HOST = "0.0.0.0"  # Listen on all interfaces
 WEB_PORT = 5000  # Port for web server
-DEBUG_MODE = True  # Enable/disable Flask debug mode
+WEB_THREADS = 8  # Number of request threads for the web server
+READINGS_CACHE_TIME = 5  # Seconds the web interface reuses current sensor readings
+MAX_HISTORY_HOURS = 24 * 31  # Longest history window the web interface serves
+DEBUG_MODE = False  # Enable/disable Flask debug mode (uses the development server)
 
 # Display Configuration (if using LCD display)
 LCD_ENABLED = False  # Set to True if using an LCD display
@@ -77,7 +77,7 @@ def start_web_interface():
     """Start the Flask web interface."""
     print("Starting web interface...")
     import app
-    app.app.run(host='0.0.0.0', port=5000, debug=False)
+    app.run_server(debug=False)
 
 def main():
     """Main function to start the weather station."""
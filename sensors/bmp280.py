@@ -8,10 +8,16 @@ from the BMP280 barometric pressure sensor.
 """
 
 import time
+import logging
 import board
 import busio
 import adafruit_bmp280
 from config import BMP280_ADDRESS, SEA_LEVEL_PRESSURE
+from .ratelimit import RateLimitFilter
+
+# Sensor errors are logged at most once every 30 seconds per message
+logger = logging.getLogger(__name__)
+logger.addFilter(RateLimitFilter(window=30))
 
 class BMP280Sensor:
     """Class for interfacing with the BMP280 barometric pressure sensor."""
@@ -28,6 +34,8 @@ class BMP280Sensor:
         self.i2c = busio.I2C(board.SCL, board.SDA)
         self.sensor = None
         self.connected = False
+        self.last_read_time = None
+        self.cache_interval = 0.2  # Seconds a reading is reused by subsequent reads
         
         # Last valid readings (used as fallback if reading fails)
         self.last_temperature = None
@@ -54,10 +62,10 @@ class BMP280Sensor:
                 self.connected = True
                 print(f"BMP280 sensor connected at alternative address 0x{self.address:02x}")
             except ValueError:
-                print("BMP280 sensor not found. Check connections and I2C address.")
+                logger.warning("BMP280 sensor not found. Check connections and I2C address.")
                 self.connected = False
         except Exception as e:
-            print(f"Error connecting to BMP280 sensor: {e}")
+            logger.warning("Error connecting to BMP280 sensor: %s", e)
             self.connected = False
     
     def read(self):
@@ -73,20 +81,30 @@ class BMP280Sensor:
             if not self.connected:
                 return self.last_temperature, self.last_pressure, self.last_altitude
         
+        # Reuse a very recent reading, so read_temperature(), read_pressure()
+        # and read_altitude() called together share one set of I2C reads
+        current_time = time.monotonic()
+        if self.last_read_time is not None and current_time - self.last_read_time < self.cache_interval:
+            return self.last_temperature, self.last_pressure, self.last_altitude
+        
         try:
             temperature = self.sensor.temperature
             pressure = self.sensor.pressure
-            altitude = self.sensor.altitude
+            
+            # Calculate altitude from the pressure just read; the driver's
+            # altitude property would read the pressure again
+            altitude = 44330 * (1.0 - (pressure / self.sea_level_pressure) ** 0.1903)
             
             # Update last valid readings
             self.last_temperature = temperature
             self.last_pressure = pressure
             self.last_altitude = altitude
+            self.last_read_time = current_time
             
             return temperature, pressure, altitude
             
         except Exception as e:
-            print(f"BMP280 reading error: {e}")
+            logger.warning("BMP280 reading error: %s", e)
             return self.last_temperature, self.last_pressure, self.last_altitude
     
     def read_temperature(self):
@@ -123,5 +141,6 @@ class BMP280Sensor:
             pressure: Current sea level pressure in hPa.
         """
         self.sea_level_pressure = pressure
+        self.last_read_time = None  # Cached altitude is no longer valid
         if self.connected:
             self.sensor.sea_level_pressure = pressure
\ No newline at end of file
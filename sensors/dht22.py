@@ -7,9 +7,15 @@ This module provides a class for reading temperature and humidity data from the
 """
 
 import time
+import logging
 import board
 import adafruit_dht
 from config import DHT_PIN
+from .ratelimit import RateLimitFilter
+
+# Sensor errors are logged at most once every 30 seconds per message
+logger = logging.getLogger(__name__)
+logger.addFilter(RateLimitFilter(window=30))
 
 class DHT22Sensor:
     """Class for interfacing with the DHT22 temperature and humidity sensor."""
@@ -22,7 +28,7 @@ class DHT22Sensor:
         """
         self.pin = pin
         self.dht_device = adafruit_dht.DHT22(getattr(board, f'D{pin}'), use_pulseio=False)
-        self.last_read_time = 0
+        self.last_read_time = float('-inf')
         self.read_interval = 2  # Minimum seconds between readings
         
         # Last valid readings (used as fallback if reading fails)
@@ -36,11 +42,14 @@ class DHT22Sensor:
             tuple: (temperature in °C, humidity in %)
                    Returns (None, None) if reading fails.
         """
-        current_time = time.time()
+        current_time = time.monotonic()
         
-        # Ensure minimum time between readings
+        # The sensor can only be read every read_interval seconds; return the
+        # last readings rather than waiting for the interval to pass
         if current_time - self.last_read_time < self.read_interval:
-            time.sleep(self.read_interval - (current_time - self.last_read_time))
+            return self.last_temperature, self.last_humidity
+        
+        self.last_read_time = current_time
         
         try:
             temperature = self.dht_device.temperature
@@ -50,16 +59,15 @@ class DHT22Sensor:
             self.last_temperature = temperature
             self.last_humidity = humidity
             
-            self.last_read_time = time.time()
             return temperature, humidity
             
         except RuntimeError as e:
             # DHT22 sometimes fails to read, return last valid readings if available
-            print(f"DHT22 reading error: {e}")
+            logger.warning("DHT22 reading error: %s", e)
             return self.last_temperature, self.last_humidity
             
         except Exception as e:
-            print(f"DHT22 sensor error: {e}")
+            logger.warning("DHT22 sensor error: %s", e)
             return self.last_temperature, self.last_humidity
     
     def read_temperature(self):
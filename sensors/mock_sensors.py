@@ -6,8 +6,53 @@ Raspberry Pi specific libraries are not available.
 """
 
 import time
-import random
+import math
+import functools
 from datetime import datetime
+import numpy as np
+
+
+class RandomStepBuffer:
+    """Random steps for a simulated random walk, generated in bulk.
+    
+    Drawing thousands of steps in one numpy call is much cheaper than calling
+    random.uniform for every reading. Simulated read errors are drawn along
+    with the steps.
+    """
+    
+    def __init__(self, low, high, error_rate=0.0, size=4096):
+        """Initialize the step buffer.
+        
+        Args:
+            low: Lower bound of the step for each simulated value
+            high: Upper bound of the step for each simulated value
+            error_rate: Probability of a simulated read error for each step
+            size: Number of steps generated at a time
+        """
+        self.low = np.asarray(low, dtype=float)
+        self.high = np.asarray(high, dtype=float)
+        self.error_rate = error_rate
+        self.size = size
+        self._rng = np.random.default_rng()
+        self._steps = None
+        self._errors = None
+        self._index = size
+    
+    def next(self):
+        """Get the next step.
+        
+        Returns:
+            tuple: (numpy.ndarray with one step for each simulated value,
+                    True if the read should fail)
+        """
+        if self._index == self.size:
+            self._steps = self._rng.uniform(self.low, self.high, size=(self.size, len(self.low)))
+            self._errors = (self._rng.random(self.size) < self.error_rate).tolist()
+            self._index = 0
+        
+        index = self._index
+        self._index += 1
+        return self._steps[index], self._errors[index]
 
 
 class MockDHT22Sensor:
@@ -20,10 +65,11 @@ class MockDHT22Sensor:
             pin: The GPIO pin number (ignored in mock implementation)
         """
         self.pin = pin
-        self.last_read_time = 0
+        self.last_read_time = float('-inf')
         self.min_interval = 2  # Minimum seconds between reads
         self.last_temperature = 21.0
         self.last_humidity = 50.0
+        self._steps = RandomStepBuffer(low=(-0.5, -2), high=(0.5, 2), error_rate=0.05)  # 5% chance of error
         print(f"Initialized Mock DHT22 sensor on pin {pin}")
     
     def read(self):
@@ -32,20 +78,22 @@ class MockDHT22Sensor:
         Returns:
             tuple: (temperature in °C, humidity in %)
         """
-        current_time = time.time()
+        current_time = time.monotonic()
         
-        # Enforce minimum read interval
+        # Like the real sensor, return the last readings if called again
+        # before the minimum read interval has passed
         if current_time - self.last_read_time < self.min_interval:
-            time.sleep(self.min_interval - (current_time - self.last_read_time))
+            return self.last_temperature, self.last_humidity
         
-        # Generate realistic random variations
-        self.last_temperature = max(10, min(40, self.last_temperature + random.uniform(-0.5, 0.5)))
-        self.last_humidity = max(20, min(90, self.last_humidity + random.uniform(-2, 2)))
+        self.last_read_time = current_time
         
-        self.last_read_time = time.time()
+        # Generate realistic random variations
+        step, error = self._steps.next()
+        values = np.clip((self.last_temperature, self.last_humidity) + step, (10, 20), (40, 90))
+        self.last_temperature, self.last_humidity = values.tolist()
         
         # Occasionally simulate a read error
-        if random.random() < 0.05:  # 5% chance of error
+        if error:
             return None, None
             
         return self.last_temperature, self.last_humidity
@@ -54,6 +102,11 @@ class MockDHT22Sensor:
 # Define BMP280 constants for mock implementation
 BMP280_ADDRESS = 0x76  # Default I2C address
 
+# Barometric formula constants: altitude = 44330 * (1 - (p / 1013.25) ** 0.1903)
+_INV_SEA_LEVEL = 1.0 / 1013.25  # Inverse of standard sea level pressure (1/hPa)
+_ALT_EXP = 0.1903
+_ALT_COEF = 44330.0  # meters
+
 class MockBMP280Sensor:
     """Mock implementation of the BMP280 temperature, pressure and altitude sensor."""
     
@@ -64,11 +117,12 @@ class MockBMP280Sensor:
             i2c_addr: The I2C address (ignored in mock implementation)
         """
         self.i2c_addr = i2c_addr
-        self.last_read_time = 0
+        self.last_read_time = float('-inf')
         self.min_interval = 1  # Minimum seconds between reads
         self.last_temperature = 20.0
         self.last_pressure = 1013.25  # Standard pressure at sea level (hPa)
         self.last_altitude = 0.0
+        self._steps = RandomStepBuffer(low=(-0.3, -1), high=(0.3, 1), error_rate=0.03)  # 3% chance of error
         print(f"Initialized Mock BMP280 sensor at I2C address 0x{i2c_addr:x}")
     
     def read(self):
@@ -77,36 +131,48 @@ class MockBMP280Sensor:
         Returns:
             tuple: (temperature in °C, pressure in hPa, altitude in meters)
         """
-        current_time = time.time()
+        current_time = time.monotonic()
         
-        # Enforce minimum read interval
+        # Return the last readings if called again before the minimum read
+        # interval has passed
         if current_time - self.last_read_time < self.min_interval:
-            time.sleep(self.min_interval - (current_time - self.last_read_time))
+            return self.last_temperature, self.last_pressure, self.last_altitude
         
-        # Generate realistic random variations
-        self.last_temperature = max(10, min(40, self.last_temperature + random.uniform(-0.3, 0.3)))
-        self.last_pressure = max(950, min(1050, self.last_pressure + random.uniform(-1, 1)))
+        self.last_read_time = current_time
         
-        # Calculate altitude based on pressure (simplified formula)
-        self.last_altitude = 44330 * (1 - (self.last_pressure / 1013.25) ** 0.1903)
+        # Generate realistic random variations
+        step, error = self._steps.next()
+        values = np.clip((self.last_temperature, self.last_pressure) + step, (10, 950), (40, 1050))
+        self.last_temperature, self.last_pressure = values.tolist()
         
-        self.last_read_time = time.time()
+        # Calculate altitude based on pressure (simplified formula), using
+        # exp/log for the non-integer power
+        self.last_altitude = _ALT_COEF * (1.0 - math.exp(_ALT_EXP * math.log(self.last_pressure * _INV_SEA_LEVEL)))
         
         # Occasionally simulate a read error
-        if random.random() < 0.03:  # 3% chance of error
+        if error:
             return None, None, None
             
         return self.last_temperature, self.last_pressure, self.last_altitude
 
 
+@functools.cache
+def _sensors():
+    """Create the mock sensors shared by get_mock_sensor_data.
+    
+    Returns:
+        tuple: (MockDHT22Sensor, MockBMP280Sensor)
+    """
+    return MockDHT22Sensor(pin=4), MockBMP280Sensor()
+
+
 def get_mock_sensor_data():
     """Get a complete set of mock sensor readings.
     
     Returns:
         dict: Dictionary containing all sensor readings
     """
-    dht = MockDHT22Sensor(pin=4)
-    bmp = MockBMP280Sensor()
+    dht, bmp = _sensors()
     
     dht_temp, humidity = dht.read()
     bmp_temp, pressure, altitude = bmp.read()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+"""
+Raspberry Pi Weather Station - Log Rate Limiting
+
+This module provides a logging filter that limits how often the same message
+is emitted, so a flaky sensor failing on every read does not flood the log.
+"""
+
+import time
+import logging
+
+class RateLimitFilter(logging.Filter):
+    """Logging filter that passes each message at most once per time window."""
+    
+    def __init__(self, window=30):
+        """Initialize the filter.
+        
+        Args:
+            window: Minimum seconds between two emissions of the same message.
+        """
+        super().__init__()
+        self.window = window
+        self.last_emit_time = {}
+    
+    def filter(self, record):
+        """Check whether a log record should be emitted.
+        
+        Records are identified by logger name and unformatted message, so
+        repeats of the same error with different details are limited together.
+        
+        Args:
+            record: The log record to check.
+        
+        Returns:
+            bool: True if the record should be emitted, False to drop it.
+        """
+        key = (record.name, record.msg)
+        current_time = time.monotonic()
+        
+        last_time = self.last_emit_time.get(key)
+        if last_time is not None and current_time - last_time < self.window:
+            return False
+        
+        self.last_emit_time[key] = current_time
+        return True
@@ -8,6 +8,11 @@ document.addEventListener('DOMContentLoaded', function() {
         // Update readings every 30 seconds without full page refresh
         setInterval(updateCurrentReadings, 30000);
     }
+    
+    // Draw history charts in the browser if on the history page
+    if (document.querySelector('.weather-history canvas')) {
+        loadHistoryCharts(24);
+    }
 });
 
 /**
@@ -48,4 +53,76 @@ function updateCurrentReadings() {
         .catch(error => {
             console.error('Error updating weather data:', error);
         });
+}
+
+/**
+ * Draws the history charts from /api/history data.
+ * Falls back to the server-rendered chart images if Chart.js is not available.
+ */
+function loadHistoryCharts(hours) {
+    const canvases = document.querySelectorAll('.weather-history canvas');
+    
+    if (typeof Chart === 'undefined') {
+        canvases.forEach(showChartImage);
+        return;
+    }
+    
+    fetch('/api/history/' + hours)
+        .then(response => response.json())
+        .then(data => {
+            drawChart('temp-chart', data.timestamp, 'Temperature (°C)', [
+                { label: 'DHT22', data: data.temperature_dht, borderColor: 'red' },
+                { label: 'BMP280', data: data.temperature_bmp, borderColor: 'blue' }
+            ]);
+            drawChart('humidity-chart', data.timestamp, 'Humidity (%)', [
+                { label: 'Humidity', data: data.humidity, borderColor: 'green' }
+            ]);
+            drawChart('pressure-chart', data.timestamp, 'Pressure (hPa)', [
+                { label: 'Pressure', data: data.pressure, borderColor: 'blue' }
+            ]);
+        })
+        .catch(error => {
+            console.error('Error loading weather history:', error);
+            canvases.forEach(showChartImage);
+        });
+}
+
+/**
+ * Draws a line chart of one or more series on the canvas with the given id
+ */
+function drawChart(canvasId, labels, yLabel, datasets) {
+    const canvas = document.getElementById(canvasId);
+    if (!canvas) {
+        return;
+    }
+    
+    datasets.forEach(dataset => {
+        dataset.borderWidth = 1.5;
+        dataset.pointRadius = 0;
+    });
+    
+    new Chart(canvas, {
+        type: 'line',
+        data: { labels: labels, datasets: datasets },
+        options: {
+            aspectRatio: 10 / 6,
+            animation: false,
+            plugins: { legend: { display: datasets.length > 1 } },
+            scales: {
+                x: { title: { display: true, text: 'Time' }, ticks: { maxTicksLimit: 8 } },
+                y: { title: { display: true, text: yLabel } }
+            }
+        }
+    });
+}
+
+/**
+ * Replaces a chart canvas with the server-rendered image of the same chart
+ */
+function showChartImage(canvas) {
+    const image = document.createElement('img');
+    image.src = canvas.dataset.fallback;
+    image.alt = canvas.getAttribute('aria-label');
+    image.className = 'chart';
+    canvas.replaceWith(image);
 }
\ No newline at end of file
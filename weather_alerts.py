@@ -9,17 +9,52 @@ and send alerts via various methods (console, email, etc.).
 
 import time
 import datetime
+import calendar
 import csv
 import os
+import queue
 import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import pandas as pd
+import threading
+from email.message import EmailMessage
+import numpy as np
 from config import (
     ALERTS_ENABLED, TEMP_HIGH_THRESHOLD, TEMP_LOW_THRESHOLD,
-    HUMIDITY_HIGH_THRESHOLD, PRESSURE_CHANGE_THRESHOLD, LOG_FILE
+    HUMIDITY_HIGH_THRESHOLD, PRESSURE_CHANGE_THRESHOLD, LOG_FILE, LOG_COLUMNS, LOG_INTERVAL
 )
 
+# Position of the pressure reading in a log row
+PRESSURE_COLUMN = LOG_COLUMNS.index('pressure')
+
+# Initial size of the pressure buffers: twice an hour's worth of log rows.
+# They grow if the log holds more rows per hour (e.g. from a shorter interval).
+PRESSURE_WINDOW_SIZE = max(64, 2 * 3600 // LOG_INTERVAL)
+
+# Log timestamps are local time. They are converted to seconds since the
+# epoch as if local time were UTC, and compared with the current time
+# converted the same way, so no time zone lookup is needed per row.
+def parse_timestamp(text):
+    """Convert a log timestamp (YYYY-MM-DD HH:MM:SS) to local epoch seconds.
+    
+    Args:
+        text: Timestamp string from the log file
+    
+    Returns:
+        int: Seconds since the epoch, with local time taken as UTC
+    
+    Raises:
+        ValueError: If the timestamp is not in the log format
+    """
+    return calendar.timegm((int(text[0:4]), int(text[5:7]), int(text[8:10]),
+                            int(text[11:13]), int(text[14:16]), int(text[17:19])))
+
+def local_time_now():
+    """Get the current time in the same convention as parse_timestamp.
+    
+    Returns:
+        int: Seconds since the epoch, with local time taken as UTC
+    """
+    return calendar.timegm(time.localtime())
+
 class WeatherAlerts:
     """Class for detecting and sending weather alerts."""
     
@@ -40,25 +75,135 @@ class WeatherAlerts:
         self.last_alert_time = {}
         self.alert_cooldown = 3600  # 1 hour between repeated alerts
         
+        # Byte offset in the log file up to which rows have been read
+        self._log_offset = 0
+        
+        # Logged readings of about the last hour, oldest first, in
+        # _ts[_start:_end] (local epoch milliseconds) and _pressure[_start:_end]
+        self._ts = np.empty(PRESSURE_WINDOW_SIZE, dtype=np.int64)
+        self._pressure = np.empty(PRESSURE_WINDOW_SIZE, dtype=np.float32)
+        self._start = 0
+        self._end = 0
+        
+        # Email alerts are sent by a background thread so a slow mail server
+        # doesn't hold up the caller
+        self._mail_queue = None
+        if self.email_config:
+            # Headers are the same for every email
+            self._to_header = ", ".join(self.email_config['recipients'])
+            self._subject = "Weather Station Alert"
+            
+            self._mail_queue = queue.Queue()
+            self._mail_thread = threading.Thread(target=self._mail_worker, daemon=True)
+            self._mail_thread.start()
+        
         # Load historical data for trend analysis
-        self.historical_data = self._load_historical_data()
+        self._load_historical_data()
     
     def _load_historical_data(self):
-        """Load historical weather data for trend analysis.
-        
-        Returns:
-            pandas.DataFrame: Historical weather data or empty DataFrame if not available
-        """
-        if not os.path.exists(LOG_FILE):
-            return pd.DataFrame()
+        """Load the last hour of logged pressure readings for trend analysis."""
+        self._log_offset = 0
+        self._start = 0
+        self._end = 0
         
         try:
-            df = pd.read_csv(LOG_FILE)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            return df
+            self._read_log_tail()
+        except FileNotFoundError:
+            pass
         except Exception as e:
             print(f"Error loading historical data for alerts: {e}")
-            return pd.DataFrame()
+    
+    def _read_log_tail(self):
+        """Add the pressure readings appended to the log file since the last read.
+        
+        Only complete lines are read; a row still being written is read by
+        the next call. Readings older than an hour are skipped.
+        """
+        with open(LOG_FILE, 'rb') as file:
+            file.seek(self._log_offset)
+            data = file.read()
+        
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return
+        
+        lines = data[:end].decode('utf-8').splitlines()
+        
+        # The first line of the file is the header
+        if self._log_offset == 0:
+            lines = lines[1:]
+        self._log_offset += end
+        
+        one_hour_ago = local_time_now() - 3600
+        for row in csv.reader(lines):
+            if len(row) != len(LOG_COLUMNS) or not row[PRESSURE_COLUMN]:
+                continue
+            
+            try:
+                timestamp = parse_timestamp(row[0])
+                pressure = float(row[PRESSURE_COLUMN])
+            except ValueError:
+                continue
+            
+            if timestamp > one_hour_ago:
+                self._add_pressure_reading(timestamp * 1000, pressure)
+    
+    def _add_pressure_reading(self, timestamp_ms, pressure):
+        """Add a reading to the pressure buffers.
+        
+        Args:
+            timestamp_ms: Time of the reading in local epoch milliseconds
+            pressure: Barometric pressure in hPa
+        """
+        if self._end == len(self._ts):
+            self._make_room()
+        
+        self._ts[self._end] = timestamp_ms
+        self._pressure[self._end] = pressure
+        self._end += 1
+        
+        # Rows are logged in order; only sort if the clock jumped back
+        if self._end - self._start > 1 and timestamp_ms < self._ts[self._end - 2]:
+            order = np.argsort(self._ts[self._start:self._end], kind='stable')
+            self._ts[self._start:self._end] = self._ts[self._start:self._end][order]
+            self._pressure[self._start:self._end] = self._pressure[self._start:self._end][order]
+    
+    def _make_room(self):
+        """Free space at the end of the full pressure buffers.
+        
+        Readings older than an hour are dropped and the rest moved to the
+        front. The buffers are doubled if they would still be over half full.
+        """
+        cutoff_ms = (local_time_now() - 3600) * 1000
+        start = self._start + int(np.searchsorted(self._ts[self._start:self._end], cutoff_ms, side='right'))
+        count = self._end - start
+        
+        if count > len(self._ts) // 2:
+            ts = np.empty(2 * len(self._ts), dtype=np.int64)
+            pressure = np.empty(2 * len(self._ts), dtype=np.float32)
+        else:
+            ts, pressure = self._ts, self._pressure
+        
+        ts[:count] = self._ts[start:self._end]
+        pressure[:count] = self._pressure[start:self._end]
+        self._ts, self._pressure = ts, pressure
+        self._start, self._end = 0, count
+    
+    def _oldest_pressure_since(self, cutoff_ms):
+        """Find the oldest buffered pressure reading taken after the cutoff.
+        
+        Readings up to the cutoff are dropped, as later cutoffs only move forward.
+        
+        Args:
+            cutoff_ms: Cutoff time in local epoch milliseconds
+        
+        Returns:
+            float: Pressure in hPa, or None if there is no such reading
+        """
+        self._start += int(np.searchsorted(self._ts[self._start:self._end], cutoff_ms, side='right'))
+        if self._start < self._end:
+            return float(self._pressure[self._start])
+        return None
     
     def check_alerts(self, current_data):
         """Check for alert conditions based on current weather data.
@@ -83,35 +228,35 @@ class WeatherAlerts:
         # Update historical data
         self._update_historical_data()
         
-        # Check temperature alerts
-        if current_data.get('temperature_dht') is not None:
-            temp = current_data['temperature_dht']
-            if temp > TEMP_HIGH_THRESHOLD:
-                alert = f"High temperature alert: {temp:.1f}°C exceeds threshold of {TEMP_HIGH_THRESHOLD}°C"
+        high_temp, low_temp = TEMP_HIGH_THRESHOLD, TEMP_LOW_THRESHOLD
+        high_humidity, pressure_threshold = HUMIDITY_HIGH_THRESHOLD, PRESSURE_CHANGE_THRESHOLD
+        
+        # Check temperature alerts (messages are only formatted for alerts
+        # that are not in cooldown)
+        temp = current_data.get('temperature_dht')
+        if temp is not None:
+            if temp > high_temp:
                 if self._check_cooldown('high_temp'):
-                    alerts.append(alert)
-            elif temp < TEMP_LOW_THRESHOLD:
-                alert = f"Low temperature alert: {temp:.1f}°C below threshold of {TEMP_LOW_THRESHOLD}°C"
+                    alerts.append(f"High temperature alert: {temp:.1f}°C exceeds threshold of {high_temp}°C")
+            elif temp < low_temp:
                 if self._check_cooldown('low_temp'):
-                    alerts.append(alert)
+                    alerts.append(f"Low temperature alert: {temp:.1f}°C below threshold of {low_temp}°C")
         
         # Check humidity alerts
-        if current_data.get('humidity') is not None:
-            humidity = current_data['humidity']
-            if humidity > HUMIDITY_HIGH_THRESHOLD:
-                alert = f"High humidity alert: {humidity:.1f}% exceeds threshold of {HUMIDITY_HIGH_THRESHOLD}%"
+        humidity = current_data.get('humidity')
+        if humidity is not None:
+            if humidity > high_humidity:
                 if self._check_cooldown('high_humidity'):
-                    alerts.append(alert)
+                    alerts.append(f"High humidity alert: {humidity:.1f}% exceeds threshold of {high_humidity}%")
         
         # Check pressure change alerts
-        if current_data.get('pressure') is not None and not self.historical_data.empty:
-            pressure = current_data['pressure']
+        pressure = current_data.get('pressure')
+        if pressure is not None:
             pressure_change = self._calculate_pressure_change(pressure)
-            if abs(pressure_change) > PRESSURE_CHANGE_THRESHOLD:
-                direction = "rising" if pressure_change > 0 else "falling"
-                alert = f"Significant pressure change: {direction} by {abs(pressure_change):.1f}hPa in the last hour"
+            if abs(pressure_change) > pressure_threshold:
                 if self._check_cooldown('pressure_change'):
-                    alerts.append(alert)
+                    direction = "rising" if pressure_change > 0 else "falling"
+                    alerts.append(f"Significant pressure change: {direction} by {abs(pressure_change):.1f}hPa in the last hour")
         
         # Send alerts if any
         if alerts:
@@ -120,14 +265,24 @@ class WeatherAlerts:
         return alerts
     
     def _update_historical_data(self):
-        """Update historical data from the log file."""
-        if os.path.exists(LOG_FILE):
-            try:
-                df = pd.read_csv(LOG_FILE)
-                df['timestamp'] = pd.to_datetime(df['timestamp'])
-                self.historical_data = df
-            except Exception as e:
-                print(f"Error updating historical data: {e}")
+        """Update historical data with rows appended to the log file."""
+        try:
+            size = os.path.getsize(LOG_FILE)
+        except FileNotFoundError:
+            return
+        
+        if size == self._log_offset:
+            return
+        
+        try:
+            # Start over if the log file was truncated or replaced
+            if size < self._log_offset:
+                self._load_historical_data()
+                return
+            
+            self._read_log_tail()
+        except Exception as e:
+            print(f"Error updating historical data: {e}")
     
     def _calculate_pressure_change(self, current_pressure):
         """Calculate pressure change over the last hour.
@@ -138,19 +293,11 @@ class WeatherAlerts:
         Returns:
             float: Pressure change in hPa over the last hour
         """
-        if self.historical_data.empty:
-            return 0
-        
-        # Get data from the last hour
-        one_hour_ago = datetime.datetime.now() - datetime.timedelta(hours=1)
-        hour_data = self.historical_data[self.historical_data['timestamp'] > one_hour_ago]
-        
-        if hour_data.empty:
+        # Compare with the oldest pressure reading in the last hour
+        oldest_pressure = self._oldest_pressure_since((local_time_now() - 3600) * 1000)
+        if oldest_pressure is None:
             return 0
         
-        # Get the oldest pressure reading in the last hour
-        oldest_pressure = hour_data.iloc[0]['pressure']
-        
         # Calculate change
         return current_pressure - oldest_pressure
     
@@ -192,39 +339,91 @@ class WeatherAlerts:
             self._send_email_alert(alerts)
     
     def _send_email_alert(self, alerts):
-        """Send alerts via email.
+        """Queue alerts to be sent via email by the mail thread.
         
         Args:
             alerts: List of alert messages to send
         """
-        if not self.email_config:
+        # No mail thread if email is not configured or close() was called
+        if self._mail_queue is None:
             return
         
-        try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.email_config['sender']
-            msg['To'] = ", ".join(self.email_config['recipients'])
-            msg['Subject'] = "Weather Station Alert"
-            
-            # Create message body
-            body = "The following weather alerts have been detected:\n\n"
-            body += "\n".join([f"- {alert}" for alert in alerts])
-            body += "\n\nThis is an automated message from your Raspberry Pi Weather Station."
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Connect to server and send
-            server = smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port'])
-            server.starttls()
-            server.login(self.email_config['username'], self.email_config['password'])
-            server.send_message(msg)
-            server.quit()
-            
-            print(f"Email alert sent to {', '.join(self.email_config['recipients'])}")
-            
-        except Exception as e:
-            print(f"Error sending email alert: {e}")
+        self._mail_queue.put(alerts)
+    
+    def _build_email(self, alerts):
+        """Build the email message for a list of alerts.
+        
+        Args:
+            alerts: List of alert messages to send
+        
+        Returns:
+            email.message.EmailMessage: Email message
+        """
+        # Create message
+        msg = EmailMessage()
+        msg['From'] = self.email_config['sender']
+        msg['To'] = self._to_header
+        msg['Subject'] = self._subject
+        
+        # Create message body
+        body = "The following weather alerts have been detected:\n\n"
+        body += "\n".join([f"- {alert}" for alert in alerts])
+        body += "\n\nThis is an automated message from your Raspberry Pi Weather Station."
+        
+        msg.set_content(body)
+        return msg
+    
+    def _connect_smtp(self):
+        """Open an authenticated connection to the configured SMTP server.
+        
+        Returns:
+            smtplib.SMTP: Connected SMTP client
+        """
+        server = smtplib.SMTP(self.email_config['smtp_server'], self.email_config['smtp_port'])
+        server.starttls()
+        server.login(self.email_config['username'], self.email_config['password'])
+        return server
+    
+    def _mail_worker(self):
+        """Send queued email alerts until None is queued.
+        
+        The SMTP connection is opened for the first email and reused for the
+        following ones, reconnecting if the server has dropped it.
+        """
+        server = None
+        for alerts in iter(self._mail_queue.get, None):
+            try:
+                msg = self._build_email(alerts)
+                
+                if server is None:
+                    server = self._connect_smtp()
+                try:
+                    server.send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    # Servers close idle connections, so retry once on a new one
+                    server = self._connect_smtp()
+                    server.send_message(msg)
+                
+                print(f"Email alert sent to {self._to_header}")
+                
+            except Exception as e:
+                print(f"Error sending email alert: {e}")
+                if server is not None:
+                    server.close()
+                    server = None
+        
+        if server is not None:
+            try:
+                server.quit()
+            except smtplib.SMTPException:
+                server.close()
+    
+    def close(self):
+        """Send any queued email alerts and stop the mail thread."""
+        if self._mail_queue is not None:
+            self._mail_queue.put(None)
+            self._mail_thread.join()
+            self._mail_queue = None
 
 # Example usage
 def main():
@@ -10,10 +10,9 @@ On non-Raspberry Pi systems, it uses mock sensors for development.
 """
 
 import time
-import datetime
-import csv
 import os
 import sys
+import atexit
 
 # Check if we're using mock sensors
 USE_MOCK_SENSORS = os.environ.get('USE_MOCK_SENSORS', 'false').lower() == 'true'
@@ -29,7 +28,10 @@ else:
     import busio
 
 # Import custom modules
-from config import LOG_INTERVAL, DATA_DIR, LOG_FILE
+from config import (
+    LOG_INTERVAL, DATA_DIR, LOG_FILE, LOG_COLUMNS, LOG_DECIMALS,
+    LOG_FLUSH_ROWS, LOG_FLUSH_SECONDS, PARQUET_ARCHIVE, PARQUET_BATCH_ROWS
+)
 try:
     from lcd_display import LCDDisplay
     lcd_available = True
@@ -44,6 +46,15 @@ except ImportError:
     alerts_available = False
     print("Weather alerts module not available. Continuing without alerts support.")
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    pyarrow_available = True
+except ImportError:
+    pyarrow_available = False
+    if PARQUET_ARCHIVE:
+        print("pyarrow not available. Continuing without the Parquet archive.")
+
 # Configuration is now imported from config.py
 
 # DHT_PIN is now imported from config.py
@@ -102,16 +113,160 @@ else:
         # Configure the sensor
         bmp280.sea_level_pressure = 1013.25  # Standard pressure at sea level in hPa
 
-# Ensure data directory exists
-os.makedirs(DATA_DIR, exist_ok=True)
+# Log file handle, held open while logging
+log_file = None
+
+# Format of a log row. Fields are a timestamp and numbers, which never need
+# CSV quoting, so rows are formatted directly rather than with csv.writer.
+LOG_ROW_FORMAT = "{},{},{},{},{},{}\n"
+
+# Format a reading for the log file, rounded to LOG_DECIMALS places without
+# trailing zeros, leaving failed readings empty
+READING_FORMAT = f".{LOG_DECIMALS}f"
+
+def format_reading(value):
+    if value is None:
+        return ""
+    return format(value, READING_FORMAT).rstrip('0').rstrip('.')
 
-# Initialize log file if it doesn't exist
+# Rows not yet written to the log file, and when the oldest of them was logged
+row_buffer = []
+oldest_row_time = 0.0
+
+# Open the log file for appending, creating it with a header row if needed.
+# Formatted rows are collected in row_buffer and written together once there
+# are LOG_FLUSH_ROWS of them or the oldest is LOG_FLUSH_SECONDS old.
 def init_log_file():
-    if not os.path.exists(LOG_FILE):
-        with open(LOG_FILE, 'w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(['timestamp', 'temperature_dht', 'humidity', 'temperature_bmp', 'pressure', 'altitude'])
+    global log_file
+    
+    if log_file is not None:
+        return
+    
+    # Ensure data directory exists
+    os.makedirs(DATA_DIR, exist_ok=True)
+    
+    try:
+        new_file = os.path.getsize(LOG_FILE) == 0
+    except FileNotFoundError:
+        new_file = True
+    
+    # A row cut short by a crash or power loss would otherwise be joined to the next row
+    partial_row = False
+    if not new_file:
+        with open(LOG_FILE, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            partial_row = file.read(1) != b'\n'
+    
+    log_file = open(LOG_FILE, 'a', newline='')
+    atexit.register(close_log_file)
+    
+    if new_file:
+        log_file.write(",".join(LOG_COLUMNS) + "\n")
         print(f"Created log file: {LOG_FILE}")
+    elif partial_row:
+        log_file.write('\n')
+    flush_log_file()
+
+# Write buffered rows to the log file
+def flush_log_file():
+    if row_buffer:
+        log_file.write("".join(row_buffer))
+        row_buffer.clear()
+    log_file.flush()
+
+# Sleep until the given time.monotonic() deadline. Buffered rows are written
+# once the oldest is LOG_FLUSH_SECONDS old, without waiting for the next row.
+def wait_until(deadline):
+    while True:
+        now = time.monotonic()
+        if row_buffer and now - oldest_row_time >= LOG_FLUSH_SECONDS:
+            flush_log_file()
+        if now >= deadline:
+            return
+        
+        wake_time = min(deadline, oldest_row_time + LOG_FLUSH_SECONDS) if row_buffer else deadline
+        time.sleep(wake_time - now)
+
+# Flush the log file to disk and close it
+def close_log_file():
+    global log_file
+    
+    if log_file is None:
+        return
+    
+    try:
+        flush_log_file()
+        os.fsync(log_file.fileno())
+    finally:
+        log_file.close()
+        log_file = None
+
+# Parquet archive: the open day's writer, that day, and rows not yet written
+parquet_writer = None
+parquet_day = None
+parquet_rows = []
+
+if PARQUET_ARCHIVE and pyarrow_available:
+    PARQUET_SCHEMA = pa.schema(
+        [('timestamp', pa.timestamp('ms', tz='UTC'))] + [(column, pa.float32()) for column in LOG_COLUMNS[1:]]
+    )
+    
+    # pyarrow imports pandas (if installed) the first time it converts Python
+    # values. Do that now, as the last batch is written at exit, when new
+    # modules can no longer register their own exit handlers.
+    pa.array([], type=pa.float32())
+
+# Path of a new Parquet archive file for the given day. A Parquet file can't
+# be appended to once closed, so a restart on the same day starts a new part.
+def parquet_path(day):
+    path = os.path.join(DATA_DIR, f"weather_log_{day}.parquet")
+    part = 0
+    while os.path.exists(path):
+        part += 1
+        path = os.path.join(DATA_DIR, f"weather_log_{day}.{part}.parquet")
+    return path
+
+# Write the buffered rows to the Parquet archive as one record batch
+def write_parquet_batch():
+    global parquet_writer
+    
+    if not parquet_rows:
+        return
+    
+    if parquet_writer is None:
+        parquet_writer = pq.ParquetWriter(parquet_path(parquet_day), PARQUET_SCHEMA)
+    
+    columns = zip(*parquet_rows)
+    batch = pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, PARQUET_SCHEMA)],
+        schema=PARQUET_SCHEMA
+    )
+    parquet_writer.write_batch(batch)
+    parquet_rows.clear()
+
+# Add a row to the Parquet archive, starting a new file when the (local)
+# day changes. The row starts with its time in epoch milliseconds.
+def archive_row(day, row):
+    global parquet_day
+    
+    if parquet_day is None:
+        atexit.register(close_parquet_archive)
+    elif day != parquet_day:
+        close_parquet_archive()
+    parquet_day = day
+    
+    parquet_rows.append(row)
+    if len(parquet_rows) >= PARQUET_BATCH_ROWS:
+        write_parquet_batch()
+
+# Write any buffered rows and close the Parquet archive file
+def close_parquet_archive():
+    global parquet_writer
+    
+    write_parquet_batch()
+    if parquet_writer is not None:
+        parquet_writer.close()
+        parquet_writer = None
 
 # Read data from DHT22 sensor
 def read_dht22():
@@ -149,9 +304,20 @@ def read_bmp280():
         print(f"BMP280 error: {e}")
         return None, None, None
 
+# Last logged second (epoch) and its formatted timestamp
+last_log_second = None
+last_log_timestamp = ""
+
 # Log sensor data to CSV file
 def log_data(temp_dht=None, humidity=None, temp_bmp=None, pressure=None, altitude=None):
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    global last_log_second, last_log_timestamp, oldest_row_time
+    
+    # Only format the timestamp when the second has changed
+    second = int(time.time())
+    if second != last_log_second:
+        last_log_timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(second))
+        last_log_second = second
+    timestamp = last_log_timestamp
     
     # Read sensor data if not provided
     if temp_dht is None or humidity is None:
@@ -161,9 +327,22 @@ def log_data(temp_dht=None, humidity=None, temp_bmp=None, pressure=None, altitud
         temp_bmp, pressure, altitude = read_bmp280()
     
     # Log data to CSV
-    with open(LOG_FILE, 'a', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow([timestamp, temp_dht, humidity, temp_bmp, pressure, altitude])
+    if log_file is None:
+        init_log_file()
+    if not row_buffer:
+        oldest_row_time = time.monotonic()
+    row_buffer.append(LOG_ROW_FORMAT.format(
+        timestamp, format_reading(temp_dht), format_reading(humidity),
+        format_reading(temp_bmp), format_reading(pressure), format_reading(altitude)
+    ))
+    if len(row_buffer) >= LOG_FLUSH_ROWS or time.monotonic() - oldest_row_time >= LOG_FLUSH_SECONDS:
+        flush_log_file()
+    
+    if PARQUET_ARCHIVE and pyarrow_available:
+        try:
+            archive_row(timestamp[:10], (second * 1000, temp_dht, humidity, temp_bmp, pressure, altitude))
+        except Exception as e:
+            print(f"Parquet archive error: {e}")
     
     # Print current readings
     print(f"[{timestamp}] Logged weather data:")
@@ -214,6 +393,9 @@ def main():
     print(f"Logging data every {LOG_INTERVAL} seconds. Press Ctrl+C to stop.")
     
     try:
+        # Schedule each reading LOG_INTERVAL after the previous one was due,
+        # so the time spent reading and logging doesn't add up
+        deadline = time.monotonic()
         while True:
             # Read sensor data and log it
             temp_dht, humidity, temp_bmp, pressure, altitude = log_data()
@@ -241,9 +423,18 @@ def main():
             #     if pressure is not None:
             #         alerts.check_pressure(pressure)
             
-            time.sleep(LOG_INTERVAL)
+            deadline += LOG_INTERVAL
+            if deadline > time.monotonic():
+                wait_until(deadline)
+            else:
+                # Fell behind schedule; start again from now
+                deadline = time.monotonic()
     except KeyboardInterrupt:
         print("\nLogging stopped by user.")
+    finally:
+        # Send any email alerts still queued
+        if alerts:
+            alerts.close()
 
 if __name__ == "__main__":
     try: